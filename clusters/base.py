@@ -1,15 +1,37 @@
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable
 
 from config import CNIEnum
+from const import OUT_DIR, PARALLELISM
+from logs import log_info, log_success
+from utils.docker_utils import ensure_docker_image
+from utils.parallel import run_parallel
+
+if TYPE_CHECKING:
+    from kubernetes import client
 
 
 class Cluster(ABC):
+    __slots__ = (
+        "name",
+        "nodes",
+        "cluster_cidr",
+        "service_cidr",
+        "cni",
+        "proxy_address",
+    )
+
+    IMAGE: str
+    _image_pulled: bool = False
+
     name: str
     nodes: int
     cluster_cidr: str
     service_cidr: str
     cni: CNIEnum
-    proxy_address: str | None = None
+    proxy_address: str | None
 
     def __init__(
         self,
@@ -27,8 +49,22 @@ class Cluster(ABC):
         self.cni = cni
         self.proxy_address = proxy_address
 
+    @classmethod
+    def prefetch_image(cls) -> None:
+        # Pull the node image once, instead of letting every cluster creation pull it
+        if cls._image_pulled:
+            return
+
+        ensure_docker_image(cls.IMAGE)
+        cls._image_pulled = True
+
     def create(self) -> None:
-        self.init_cluster()
+        # Prefetch CNI resources while the cluster is being created
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            prefetch = executor.submit(self.prefetch_cni)
+            self.init_cluster()
+            prefetch.result()
+
         self.install_cni()
 
     def set_proxy(self, proxy_address: str) -> None:
@@ -39,7 +75,26 @@ class Cluster(ABC):
         raise NotImplementedError("Subclasses must implement this method.")
 
     def get_kubeconfig_location(self) -> str:
-        return f"out/kubeconfigs/{self.name}.yaml"
+        return str(OUT_DIR / "kubeconfigs" / f"{self.name}.yaml")
+
+    def _save_kubeconfig(self, content: str) -> None:
+        kubeconfig_location = self.get_kubeconfig_location()
+        os.makedirs(os.path.dirname(kubeconfig_location), exist_ok=True)
+
+        # Kubeconfigs hold credentials: create them private, and swap them in atomically
+        # so that a half-written file is never picked up
+        temp_location = f"{kubeconfig_location}.tmp"
+        fd = os.open(temp_location, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(temp_location, kubeconfig_location)
+
+    @property
+    def api_client(self) -> "client.ApiClient":
+        # Only available once the cluster has been created
+        from utils.kubernetes_utils import get_api_client
+
+        return get_api_client(self.get_kubeconfig_location())
 
     @abstractmethod
     def init_cluster(self) -> None:
@@ -48,3 +103,48 @@ class Cluster(ABC):
     @abstractmethod
     def install_cni(self) -> None:
         raise NotImplementedError("Subclasses must implement this method.")
+
+    def prefetch_cni(self) -> None:
+        """Optional hook, runs concurrently with init_cluster."""
+        return None
+
+
+def create_many(clusters: Iterable[Cluster], max_workers: int = PARALLELISM) -> None:
+    """Creates the given clusters concurrently."""
+    clusters = list(clusters)
+
+    run_parallel(
+        lambda cluster_type: cluster_type.prefetch_image(),
+        {type(cluster) for cluster in clusters},
+        max_workers=max_workers,
+        describe=lambda cluster_type: f"image {cluster_type.IMAGE}",
+    )
+
+    run_parallel(
+        _create_cluster,
+        clusters,
+        max_workers=max_workers,
+        describe=lambda cluster: f"cluster {cluster.name}",
+    )
+
+
+def cleanup_many(clusters: Iterable[Cluster], max_workers: int = PARALLELISM) -> None:
+    """Cleans up the given clusters concurrently."""
+    run_parallel(
+        _cleanup_cluster,
+        clusters,
+        max_workers=max_workers,
+        describe=lambda cluster: f"cluster {cluster.name}",
+    )
+
+
+def _create_cluster(cluster: Cluster) -> None:
+    log_info(f"Creating cluster: {cluster.name}")
+    cluster.create()
+    log_success(f"Cluster {cluster.name} created successfully.")
+
+
+def _cleanup_cluster(cluster: Cluster) -> None:
+    log_info(f"Cleaning up cluster: {cluster.name}")
+    cluster.cleanup()
+    log_success(f"Cluster {cluster.name} cleaned up successfully.")
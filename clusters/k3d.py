@@ -1,7 +1,7 @@
+import functools
+import logging
 import yaml
-import os
 import subprocess
-from kubernetes import config, client
 
 from clusters.base import Cluster
 from cni.base import CNI
@@ -10,9 +10,20 @@ from cni.cilium import Cilium
 from config import CNIEnum
 from const import DOCKER_NETWORK_NAME
 from utils.cache import REGISTRY_PROXY_CA_VOLUME
+from utils.yaml_utils import SafeDumper
+
+
+# CNI plugins supported by k3d, None means that no installation is needed
+_CNI_CTORS: dict[CNIEnum, type[CNI] | None] = {
+    CNIEnum.calico: Calico,
+    CNIEnum.cilium: Cilium,
+    CNIEnum.flannel: None,  # Default in k3s
+}
 
 
 class K3d(Cluster):
+    __slots__ = ()
+
     IMAGE = "docker.io/rancher/k3s:v1.30.2-k3s2"  # TODO custom image
 
     def cleanup(self) -> None:
@@ -23,7 +34,6 @@ class K3d(Cluster):
 
     def init_cluster(self) -> None:
         cluster_config = self._gen_config()
-        cluster_config_yaml = yaml.dump(cluster_config)
 
         additional_args = []
 
@@ -37,59 +47,108 @@ class K3d(Cluster):
                 ]
             )
 
-        # Create the cluster using k3d CLI
-        subprocess.run(
-            [
-                "k3d",
-                "cluster",
-                "create",
-                self.name,
-                "--config",
-                "-",
-                "--kubeconfig-update-default=false",
-            ]
-            + additional_args,
-            input=cluster_config_yaml.encode(),
-            check=True,
-        )
+        # Create the cluster using k3d CLI, streaming its output so that the kubeconfig
+        # can be fetched while k3d is still finishing up after the cluster is ready
+        command = [
+            "k3d",
+            "cluster",
+            "create",
+            self.name,
+            "--config",
+            "-",
+            "--kubeconfig-update-default=false",
+        ] + additional_args
+        kubeconfig_process: subprocess.Popen | None = None
+
+        with subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        ) as process:
+            yaml.dump(cluster_config, process.stdin, Dumper=SafeDumper)
+            process.stdin.close()
 
-        # Save kubeconfig content
-        kubeconfig_content = self._get_kubeconfig_content()
-        kubeconfig_location = self.get_kubeconfig_location()
+            for line in process.stdout:
+                logging.info("[%s] %s", self.name, line.rstrip())
+                if kubeconfig_process is None and self._is_created_message(line):
+                    kubeconfig_process = self._start_kubeconfig_get()
 
-        os.makedirs(os.path.dirname(kubeconfig_location), exist_ok=True)
+        if process.returncode != 0:
+            if kubeconfig_process is not None:
+                kubeconfig_process.kill()
+                kubeconfig_process.wait()
+            raise subprocess.CalledProcessError(process.returncode, command)
 
-        with open(kubeconfig_location, "w") as f:
-            f.write(kubeconfig_content)
+        # Save kubeconfig content
+        kubeconfig_content = self._get_kubeconfig_content(kubeconfig_process)
+        self._save_kubeconfig(kubeconfig_content)
 
     def install_cni(self) -> None:
-        kubeconfig_location = self.get_kubeconfig_location()
-
-        # Install the selected CNI plugin
-        cni: CNI | None = None
-
-        match self.cni:
-            case CNIEnum.calico:
-                cni = Calico(kubeconfig=kubeconfig_location, cidr=self.cluster_cidr)
-            case CNIEnum.cilium:
-                cni = Cilium(kubeconfig=kubeconfig_location, cidr=self.cluster_cidr)
-            case CNIEnum.flannel:
-                # Skip installation as flannel is default
-                pass
-            case _:
-                raise ValueError(f"Unsupported CNI: {self.cni}")
-
+        # The CNI builds the (cached) api client lazily, only if it needs one
+        cni = self._new_cni()
         if cni is not None:
             cni.install()
 
-    def _get_kubeconfig_content(self) -> str:
-        result = subprocess.run(
+    def prefetch_cni(self) -> None:
+        cni = self._new_cni()
+        if cni is not None:
+            cni.prefetch()
+
+    def _new_cni(self) -> CNI | None:
+        try:
+            ctor = _CNI_CTORS[self.cni]
+        except KeyError:
+            raise ValueError(f"Unsupported CNI: {self.cni}") from None
+
+        if ctor is None:
+            return None
+
+        return ctor(
+            kubeconfig=self.get_kubeconfig_location(),
+            cidr=self.cluster_cidr,
+        )
+
+    def _is_created_message(self, line: str) -> bool:
+        return f"Cluster '{self.name}' created successfully" in line
+
+    def _start_kubeconfig_get(self) -> subprocess.Popen:
+        return subprocess.Popen(
             ["k3d", "kubeconfig", "get", self.name],
-            capture_output=True,
+            stdout=subprocess.PIPE,
             text=True,
-            check=True,
         )
-        return result.stdout
+
+    def _get_kubeconfig_content(
+        self, process: subprocess.Popen | None = None
+    ) -> str:
+        if process is None:
+            process = self._start_kubeconfig_get()
+
+        stdout, _ = process.communicate()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, process.args)
+
+        return stdout
+
+    @classmethod
+    @functools.lru_cache(maxsize=32)
+    def _gen_node_labels(cls, nodes: int) -> tuple[dict, ...]:
+        # Shared between clusters with the same number of nodes: do not mutate
+        return (
+            {
+                "label": "tier=worker-0",
+                "nodeFilters": ["server:0"],
+            },
+            *(
+                {
+                    "label": f"tier=worker-{i}",
+                    "nodeFilters": [f"agent:{i - 1}"],
+                }
+                for i in range(1, nodes)
+            ),
+        )
 
     def _gen_config(self) -> dict:
         conf = {
@@ -111,19 +170,7 @@ class K3d(Cluster):
                             "nodeFilters": ["server:*"],
                         },
                     ],
-                    "nodeLabels": [
-                        {
-                            "label": "tier=worker-0",
-                            "nodeFilters": ["server:0"],
-                        },
-                        *[
-                            {
-                                "label": f"tier=worker-{i}",
-                                "nodeFilters": [f"agent:{i - 1}"],
-                            }
-                            for i in range(1, self.nodes)
-                        ],
-                    ],
+                    "nodeLabels": list(self._gen_node_labels(self.nodes)),
                 }
             },
             "env": [],
@@ -157,9 +204,9 @@ class K3d(Cluster):
         return conf
 
     def get_api_server_address(self) -> str:
-        kubeconfig_location = self.get_kubeconfig_location()
-        k8s_client = config.new_client_from_config(config_file=kubeconfig_location)
-        v1 = client.CoreV1Api(k8s_client)
+        from kubernetes import client
+
+        v1 = client.CoreV1Api(self.api_client)
 
         label_selector = "node-role.kubernetes.io/master"
 
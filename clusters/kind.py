@@ -1,11 +1,18 @@
+import functools
+import logging
 import yaml
 import subprocess
 
 from clusters.base import Cluster
 from config import CNIEnum
+from utils.kubernetes_utils import wait_for_nodes_ready
+from utils.parallel import run_parallel
+from utils.yaml_utils import SafeDumper
 
 
 class Kind(Cluster):
+    __slots__ = ()
+
     IMAGE = "kindest/node:v1.30.0"  # TODO custom image
 
     def cleanup(self) -> None:
@@ -16,30 +23,43 @@ class Kind(Cluster):
 
     def init_cluster(self) -> None:
         cluster_config = self._gen_config()
-        cluster_config_yaml = yaml.dump(cluster_config)
 
-        # Create the cluster using kind CLI
-        subprocess.run(
-            [
-                "kind",
-                "create",
-                "cluster",
-                "--name",
-                self.name,
-                "--kubeconfig",
-                self.get_kubeconfig_location(),
-                "--config",
-                "-",
-                "--wait",
-                "5m",
-            ],
-            input=cluster_config_yaml.encode(),
-            check=True,
-        )
+        # Create the cluster using kind CLI, streaming the config to its stdin
+        command = [
+            "kind",
+            "create",
+            "cluster",
+            "--name",
+            self.name,
+            "--kubeconfig",
+            self.get_kubeconfig_location(),
+            "--config",
+            "-",
+        ]
+        with subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        ) as process:
+            yaml.dump(cluster_config, process.stdin, Dumper=SafeDumper)
+            process.stdin.close()
 
+            # Clusters are created in parallel, so tag the output with the cluster name
+            for line in process.stdout:
+                logging.info("[%s] %s", self.name, line.rstrip())
+
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+
+        # Nodes are configured while they are still becoming ready, instead of
+        # letting kind block until they are
         if self.proxy_address is not None:
             self._install_cache_proxy()
 
+        wait_for_nodes_ready(self.api_client, timeout=300)
+
     def install_cni(self) -> None:
         if self.cni != CNIEnum.kindnet:
             raise ValueError("Only 'kindnet' CNI is supported for kind clusters")
@@ -61,18 +81,48 @@ class Kind(Cluster):
         return nodes
 
     def _install_cache_proxy(self) -> None:
-        for node in self._get_nodes():
-            subprocess.run(
-                [
-                    "docker",
-                    "exec",
-                    node,
-                    "sh",
-                    "-c",
-                    f"curl {self.proxy_address}/setup/systemd | sed s/docker\.service/containerd\.service/g | sed '/Environment/ s/$/ \"NO_PROXY=127.0.0.0\/8,10.0.0.0\/8,172.16.0.0\/12,192.168.0.0\/16\"/' | bash",
-                ],
-                check=True,
-            )
+        # Same for every node, so build it once. Containerd is used instead of docker
+        # inside kind nodes, and cluster-internal traffic must bypass the proxy.
+        command = (
+            f"curl {self.proxy_address}/setup/systemd"
+            r" | sed 's/docker\.service/containerd.service/g'"
+            r""" | sed '/Environment/ s/$/ "NO_PROXY=127.0.0.0\/8,10.0.0.0\/8,"""
+            r"""172.16.0.0\/12,192.168.0.0\/16"/'"""
+            " | bash"
+        )
+
+        # Nodes are configured independently, so do them all at once
+        run_parallel(
+            lambda node: self._install_cache_proxy_in_node(node, command),
+            self._get_nodes(),
+            describe=lambda node: f"node {node}",
+        )
+
+    def _install_cache_proxy_in_node(self, node: str, command: str) -> None:
+        subprocess.run(
+            ["docker", "exec", node, "sh", "-c", command],
+            check=True,
+        )
+
+    @classmethod
+    @functools.lru_cache(maxsize=32)
+    def _gen_nodes(cls, nodes: int) -> tuple[dict, ...]:
+        # Shared between clusters with the same number of nodes: do not mutate
+        return (
+            {
+                "role": "control-plane",
+                "image": cls.IMAGE,
+                "labels": {"tier": "worker-0"},
+            },
+            *(
+                {
+                    "role": "worker",
+                    "image": cls.IMAGE,
+                    "labels": {"tier": f"worker-{i}"},
+                }
+                for i in range(1, nodes)
+            ),
+        )
 
     def _gen_config(self) -> dict:
         return {
@@ -82,19 +132,5 @@ class Kind(Cluster):
                 "podSubnet": self.cluster_cidr,
                 "serviceSubnet": self.service_cidr,
             },
-            "nodes": [
-                {
-                    "role": "control-plane",
-                    "image": self.IMAGE,
-                    "labels": {"tier": "worker-0"},
-                },
-                *[
-                    {
-                        "role": "worker",
-                        "image": self.IMAGE,
-                        "labels": {"tier": f"worker-{i}"},
-                    }
-                    for i in range(1, self.nodes)
-                ],
-            ],
+            "nodes": list(self._gen_nodes(self.nodes)),
         }
@@ -1,13 +1,37 @@
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from kubernetes import client
 
 
 class CNI(ABC):
+    __slots__ = ("kubeconfig", "cidr", "api_client")
+
     kubeconfig: str
     cidr: str
+    api_client: "client.ApiClient | None"
 
-    def __init__(self, kubeconfig: str, cidr: str) -> None:
+    def __init__(
+        self,
+        kubeconfig: str,
+        cidr: str,
+        api_client: "client.ApiClient | None" = None,
+    ) -> None:
         self.kubeconfig = kubeconfig
         self.cidr = cidr
+        self.api_client = api_client
+
+    def get_api_client(self) -> "client.ApiClient":
+        if self.api_client is None:
+            from utils.kubernetes_utils import get_api_client
+
+            self.api_client = get_api_client(self.kubeconfig)
+        return self.api_client
+
+    def prefetch(self) -> None:
+        """Optional hook to download the installation resources in advance."""
+        return None
 
     @abstractmethod
     def install(self) -> None:
@@ -1,44 +1,163 @@
+import functools
+import os
 import tempfile
-import requests
-from kubernetes import utils, config, client
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable, Iterator
 
 from cni.base import CNI
+from const import OUT_DIR
+from utils.yaml_utils import SafeLoader
+
+if TYPE_CHECKING:
+    import requests
+
+
+_TIMEOUT = (5, 30)  # (connect, read) seconds
+_CHUNK_SIZE = 64 * 1024
+
+
+class _ManifestLoader(SafeLoader):
+    # Same resolution rules as kubernetes.utils.create_from_yaml, which does not
+    # resolve a bare '=' as a value (the loader resolvers are pure Python also
+    # for the LibYAML-backed loader, so they can be overridden here)
+    yaml_implicit_resolvers = SafeLoader.yaml_implicit_resolvers.copy()
+    yaml_implicit_resolvers.pop("=", None)
+
+
+@functools.cache
+def _get_session() -> "requests.Session":
+    # Shared session so manifest downloads reuse pooled keep-alive connections.
+    # Built on first use, so that requests is only imported when Calico is installed.
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=3, status_forcelist=[502, 503, 504], backoff_factor=0.5
+            ),
+        ),
+    )
+    return session
+
+
+# Resources that do not depend on the installation parameters, shared between installs
+_CALICO_STATIC_RESOURCES = (
+    {
+        "apiVersion": "operator.tigera.io/v1",
+        "kind": "APIServer",
+        "metadata": {"name": "default"},
+        "spec": {},
+    },
+    {
+        "apiVersion": "operator.tigera.io/v1",
+        "kind": "Goldmane",
+        "metadata": {"name": "default"},
+    },
+    {
+        "apiVersion": "operator.tigera.io/v1",
+        "kind": "Whisker",
+        "metadata": {"name": "default"},
+    },
+)
 
 
 class Calico(CNI):
+    __slots__ = ("version",)
+
     version: str
 
     def __init__(self, version: str = "3.30.3", **kwargs) -> None:
         super().__init__(**kwargs)
         self.version = version
 
-    def install(self) -> None:
-        k8s_client = config.new_client_from_config(config_file=self.kubeconfig)
+    def prefetch(self) -> None:
+        # Populate the manifest cache, install() then reads from it
+        urls = self._get_manifest_urls()
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            list(executor.map(self._ensure_manifest, urls))
 
-        # Save manifests to temp files and apply them
-        for url in [
-            f"https://raw.githubusercontent.com/projectcalico/calico/v{self.version}/manifests/operator-crds.yaml",
-            f"https://raw.githubusercontent.com/projectcalico/calico/v{self.version}/manifests/tigera-operator.yaml",
-        ]:
-            with tempfile.NamedTemporaryFile() as temp_crds:
-                response = requests.get(url)
-                response.raise_for_status()
+    def install(self) -> None:
+        from kubernetes import client, utils
 
-                temp_crds.write(response.content)
-                temp_crds.flush()
+        k8s_client = self.get_api_client()
 
-                utils.create_from_yaml(k8s_client, temp_crds.name)
+        # Fetch the manifests concurrently, then apply them in order (CRDs first).
+        # The first manifest is applied while the second one may still be downloading.
+        urls = self._get_manifest_urls()
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            manifest_paths = executor.map(self._ensure_manifest, urls)
+            utils.create_from_yaml(
+                k8s_client, yaml_objects=self._load_manifests(manifest_paths)
+            )
 
-        # Apply Calico installation configuration
+        # Apply Calico installation configuration, the resources are independent
         custom_objects_api = client.CustomObjectsApi(k8s_client)
-        for resource in self._gen_config():
+
+        def create_resource(resource: dict) -> None:
+            group, version = resource["apiVersion"].split("/")
             custom_objects_api.create_cluster_custom_object(
-                group=resource["apiVersion"].split("/")[0],
-                version=resource["apiVersion"].split("/")[1],
+                group=group,
+                version=version,
                 plural=resource["kind"].lower() + "s",
                 body=resource,
             )
 
+        resources = self._gen_config()
+        with ThreadPoolExecutor(max_workers=len(resources)) as executor:
+            list(executor.map(create_resource, resources))
+
+    def _get_manifest_urls(self) -> list[str]:
+        return [
+            f"https://raw.githubusercontent.com/projectcalico/calico/v{self.version}/manifests/operator-crds.yaml",
+            f"https://raw.githubusercontent.com/projectcalico/calico/v{self.version}/manifests/tigera-operator.yaml",
+        ]
+
+    @staticmethod
+    def _load_manifests(manifest_paths: Iterable[str]) -> Iterator[dict]:
+        # Documents are parsed lazily, one at a time, across all the manifests
+        for manifest_path in manifest_paths:
+            with open(manifest_path, "rb") as f:
+                yield from yaml.load_all(f, Loader=_ManifestLoader)
+
+    def _get_manifest_cache_dir(self) -> str:
+        return str(OUT_DIR / "manifests" / f"calico-{self.version}")
+
+    def _ensure_manifest(self, url: str) -> str:
+        # Manifests are immutable for a given version, so download them only once
+        manifest_path = os.path.join(
+            self._get_manifest_cache_dir(), os.path.basename(url)
+        )
+        if os.path.exists(manifest_path) and os.path.getsize(manifest_path) > 0:
+            return manifest_path
+
+        # Stream to a temporary file first so that a partial download is never cached
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with _get_session().get(url, stream=True, timeout=_TIMEOUT) as response:
+            response.raise_for_status()
+
+            with tempfile.NamedTemporaryFile(
+                dir=os.path.dirname(manifest_path), delete=False
+            ) as f:
+                try:
+                    for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                        f.write(chunk)
+                    f.close()
+                    os.replace(f.name, manifest_path)
+                except BaseException:
+                    # Do not leave partial downloads behind
+                    f.close()
+                    os.unlink(f.name)
+                    raise
+
+        return manifest_path
+
     def _gen_config(self) -> list[dict]:
         return [
             {
@@ -61,20 +180,5 @@ class Calico(CNI):
                     }
                 },
             },
-            {
-                "apiVersion": "operator.tigera.io/v1",
-                "kind": "APIServer",
-                "metadata": {"name": "default"},
-                "spec": {},
-            },
-            {
-                "apiVersion": "operator.tigera.io/v1",
-                "kind": "Goldmane",
-                "metadata": {"name": "default"},
-            },
-            {
-                "apiVersion": "operator.tigera.io/v1",
-                "kind": "Whisker",
-                "metadata": {"name": "default"},
-            },
+            *_CALICO_STATIC_RESOURCES,
         ]
@@ -1,10 +1,33 @@
+import functools
 import subprocess
 import yaml
 
 from cni.base import CNI
+from utils.yaml_utils import SafeDumper
+
+
+# Keep Cilium off the virtual nodes created by Liqo
+_CILIUM_AFFINITY = {
+    "nodeAffinity": {
+        "requiredDuringSchedulingIgnoredDuringExecution": {
+            "nodeSelectorTerms": [
+                {
+                    "matchExpressions": [
+                        {
+                            "key": "liqo.io/type",
+                            "operator": "DoesNotExist",
+                        }
+                    ]
+                }
+            ]
+        }
+    }
+}
 
 
 class Cilium(CNI):
+    __slots__ = ("version",)
+
     version: str
 
     def __init__(self, version: str = "1.18.6", **kwargs) -> None:
@@ -24,27 +47,19 @@ class Cilium(CNI):
         ]
         subprocess.run(
             command,
-            input=yaml.dump(self._gen_config()).encode(),
+            input=self._gen_config_bytes(self.cidr),
             check=True,
         )
 
-    def _gen_config(self) -> list[dict]:
+    @classmethod
+    @functools.lru_cache(maxsize=32)
+    def _gen_config_bytes(cls, cidr: str) -> bytes:
+        # The values only depend on the CIDR, so serialize them once per CIDR
+        return yaml.dump(cls._gen_config(cidr), Dumper=SafeDumper).encode()
+
+    @staticmethod
+    def _gen_config(cidr: str) -> dict:
         return {
-            "affinity": {
-                "nodeAffinity": {
-                    "requiredDuringSchedulingIgnoredDuringExecution": {
-                        "nodeSelectorTerms": [
-                            {
-                                "matchExpressions": [
-                                    {
-                                        "key": "liqo.io/type",
-                                        "operator": "DoesNotExist",
-                                    }
-                                ]
-                            }
-                        ]
-                    }
-                }
-            },
-            "ipam": {"operator": {"clusterPoolIPv4PodCIDRList": [self.cidr]}},
+            "affinity": _CILIUM_AFFINITY,
+            "ipam": {"operator": {"clusterPoolIPv4PodCIDRList": [cidr]}},
         }
@@ -1,9 +1,34 @@
+import functools
+import hashlib
+import pickle
+import tempfile
+import logging
 import yaml
 import os
 from enum import Enum
 from typing import List, Optional, Any, Tuple
 from pydantic import BaseModel, Field, model_validator, ValidationError
 
+from const import OUT_DIR
+from logs import log_error, log_success
+from utils.yaml_utils import SafeLoader
+
+
+CONFIG_CACHE_VERSION_HEADER = b"# content-version:"
+# Bump when the layout of the cached data changes
+CONFIG_CACHE_FORMAT = 1
+# Kept away from the configuration files, as caches are unpickled when read
+CONFIG_CACHE_DIR = str(OUT_DIR / "config-cache")
+
+# Cluster fields that fall back to the 'default' section when not set
+INHERITABLE_FIELDS = (
+    "runtime",
+    "nodes",
+    "cni",
+    "cluster_cidr",
+    "service_cidr",
+)
+
 
 class RuntimeEnum(str, Enum):
     k3d = "k3d"
@@ -26,10 +51,27 @@ class LiqoConfig(BaseModel):
     installations: List[LiqoInstallationConfig] = Field(default_factory=list)
     peerings: List[Tuple[str, str]] = Field(default_factory=list)
 
+    @classmethod
+    def from_trusted(cls, data: dict) -> "LiqoConfig":
+        return cls.model_construct(
+            installations=[
+                LiqoInstallationConfig.model_construct(**installation)
+                for installation in data["installations"]
+            ],
+            peerings=data["peerings"],
+        )
+
 
 class ToolsConfig(BaseModel):
     liqo: Optional[LiqoConfig] = None
 
+    @classmethod
+    def from_trusted(cls, data: dict) -> "ToolsConfig":
+        liqo = data["liqo"]
+        return cls.model_construct(
+            liqo=None if liqo is None else LiqoConfig.from_trusted(liqo),
+        )
+
 
 class CommonConfig(BaseModel):
     runtime: RuntimeEnum = RuntimeEnum.k3d
@@ -49,6 +91,18 @@ class NamespaceConfig(BaseModel):
     name: str
     deployments: Optional[List[DeploymentsConfig]] = Field(default_factory=list)
 
+    @classmethod
+    def from_trusted(cls, data: dict) -> "NamespaceConfig":
+        deployments = data["deployments"]
+        return cls.model_construct(
+            **{
+                **data,
+                "deployments": None
+                if deployments is None
+                else [DeploymentsConfig.model_construct(**d) for d in deployments],
+            }
+        )
+
 
 class ClusterConfig(BaseModel):
     name: str
@@ -61,6 +115,18 @@ class ClusterConfig(BaseModel):
 
     namespaces: Optional[List[NamespaceConfig]] = Field(default_factory=list)
 
+    @classmethod
+    def from_trusted(cls, data: dict) -> "ClusterConfig":
+        namespaces = data["namespaces"]
+        return cls.model_construct(
+            **{
+                **data,
+                "namespaces": None
+                if namespaces is None
+                else [NamespaceConfig.from_trusted(n) for n in namespaces],
+            }
+        )
+
 
 class CacheConfig(BaseModel):
     enabled: Optional[bool] = False
@@ -72,28 +138,45 @@ class RootConfig(BaseModel):
     tools: Optional[ToolsConfig] = Field(default_factory=ToolsConfig)
     cache: Optional[CacheConfig] = Field(default_factory=CacheConfig)
 
+    @classmethod
+    def from_trusted(cls, data: dict) -> "RootConfig":
+        """
+        Builds the configuration from the model_dump() of an already validated one,
+        skipping field validation. Defaults are already merged in the data, so only
+        the cross-cluster checks are run again.
+        """
+        default, tools, cache = data["default"], data["tools"], data["cache"]
+        cfg = cls.model_construct(
+            default=(
+                None if default is None else CommonConfig.model_construct(**default)
+            ),
+            clusters=[ClusterConfig.from_trusted(c) for c in data["clusters"]],
+            tools=None if tools is None else ToolsConfig.from_trusted(tools),
+            cache=None if cache is None else CacheConfig.model_construct(**cache),
+        )
+        return cfg.validate_global_logic()
+
     @model_validator(mode="after")
     def merge_defaults_into_clusters(self):
         """
         Merges values from the 'default' section into each cluster entry
         if the cluster doesn't specify them.
         """
+        # An explicit 'default: null' still falls back to the built-in defaults
+        default = self.default if self.default is not None else CommonConfig()
+
+        # Only the fields that have a default value can be inherited
+        defaults = {
+            field: value
+            for field in INHERITABLE_FIELDS
+            if (value := getattr(default, field)) is not None
+        }
+
         for cluster in self.clusters:
             # If missing in cluster AND present in default -> Copy from default
-            inheritable_fields = [
-                "runtime",
-                "nodes",
-                "cni",
-                "cluster_cidr",
-                "service_cidr",
-            ]
-
-            for field in inheritable_fields:
-                if (
-                    getattr(cluster, field) is None
-                    and getattr(self.default, field) is not None
-                ):
-                    setattr(cluster, field, getattr(self.default, field))
+            for field, value in defaults.items():
+                if getattr(cluster, field) is None:
+                    setattr(cluster, field, value)
 
         return self
 
@@ -102,15 +185,17 @@ class RootConfig(BaseModel):
         """
         Validates cross-cluster logic (uniqueness).
         """
-        cluster_names = set()
-
-        # Check name uniqueness
-        for i, cluster in enumerate(self.clusters):
-            if cluster.name in cluster_names:
-                raise ValueError(
-                    f"Duplicate cluster name found: '{cluster.name}' (at clusters.{i})."
-                )
-            cluster_names.add(cluster.name)
+        cluster_names = [cluster.name for cluster in self.clusters]
+
+        # Check name uniqueness, only looking for the culprit if there is one
+        if len(set(cluster_names)) != len(cluster_names):
+            seen = set()
+            for i, name in enumerate(cluster_names):
+                if name in seen:
+                    raise ValueError(
+                        f"Duplicate cluster name found: '{name}' (at clusters.{i})."
+                    )
+                seen.add(name)
 
         return self
 
@@ -131,18 +216,18 @@ def validate_data(raw_data: Any) -> Optional[RootConfig]:
     """Main function to run the validation."""
 
     if raw_data is None:
-        print("❌ File is empty.")
+        log_error("File is empty.")
         return None
 
     try:
         # Trigger Validation
         cfg = RootConfig(**raw_data)
-        print("✅ Validation Successful!")
+        log_success("Validation Successful!")
 
     except ValidationError as e:
-        print("❌ Validation Failed. Errors found:")
+        log_error("Validation Failed. Errors found:")
         for err in e.errors():
-            print(f" - {format_pydantic_error(err)}")
+            log_error(f" - {format_pydantic_error(err)}")
         return None
 
     return cfg
@@ -151,21 +236,130 @@ def validate_data(raw_data: Any) -> Optional[RootConfig]:
 def validate_config_file(file_path: str) -> Optional[RootConfig]:
     """Loads and validates a YAML configuration file."""
 
-    if not os.path.exists(file_path):
-        print(f"❌ File not found: {file_path}")
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        log_error(f"File not found: {file_path}")
+        return None
+
+    # Reuse the previous result as long as the file is unchanged
+    return _load_config_file(
+        os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _load_config_file(
+    file_path: str, mtime_ns: int, size: int
+) -> Optional[RootConfig]:
+    """Loads and validates a YAML configuration file, cached by mtime and size."""
+
+    with open(file_path, "rb") as f:
+        raw_bytes = f.read()
+
+    # Skip parsing and validation if this exact content was already validated
+    cache_path = _get_config_cache_path(file_path, raw_bytes, mtime_ns, size)
+    cfg = _read_config_cache(cache_path)
+    if cfg is not None:
+        log_success("Validation Successful! (cached)")
+        return cfg
+
+    try:
+        raw_data = yaml.load(raw_bytes, Loader=SafeLoader)
+    except yaml.YAMLError as e:
+        log_error(f"YAML Syntax Error: {e}")
+        return None
+
+    cfg = validate_data(raw_data)
+    if cfg is not None:
+        _write_config_cache(file_path, cache_path, cfg)
+
+    return cfg
+
+
+def _get_config_cache_path(
+    file_path: str, raw_bytes: bytes, mtime_ns: int, size: int
+) -> str:
+    """
+    Returns the location of the validated configuration cache for the given content.
+    A first line like '# content-version: 3' is used as the key, together with the
+    file mtime and size, instead of the whole file, so that large files do not need
+    to be hashed while edits that do not bump the version are still detected.
+    The schema key invalidates the caches written by a different version of this
+    module, whose defaults or validators may differ.
+    """
+    first_line = raw_bytes.split(b"\n", 1)[0]
+    if first_line.startswith(CONFIG_CACHE_VERSION_HEADER):
+        version = first_line[len(CONFIG_CACHE_VERSION_HEADER) :].strip()
+        key_source = b"%s:%d:%d" % (version, mtime_ns, size)
+    else:
+        key_source = raw_bytes
+
+    key = hashlib.blake2b(
+        _get_config_schema_key() + key_source, digest_size=8
+    ).hexdigest()
+    cache_name = f"{_get_config_cache_prefix(file_path)}{key}.pkl"
+    return os.path.join(CONFIG_CACHE_DIR, cache_name)
+
+
+@functools.cache
+def _get_config_schema_key() -> bytes:
+    # Any change to this module (models, defaults, validators) invalidates the caches
+    with open(__file__, "rb") as f:
+        module_digest = hashlib.blake2b(f.read(), digest_size=8).digest()
+    return b"%d:%s:" % (CONFIG_CACHE_FORMAT, module_digest)
+
+
+def _get_config_cache_prefix(file_path: str) -> str:
+    # Caches are stored under out/, named after the configuration file they belong to
+    return hashlib.blake2b(file_path.encode(), digest_size=8).hexdigest() + "."
+
+
+def _read_config_cache(cache_path: str) -> Optional[RootConfig]:
+    try:
+        with open(cache_path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ImportError, AttributeError):
+        # Missing, corrupted or referencing classes that no longer exist
         return None
 
-    with open(file_path, "r") as f:
-        try:
-            raw_data = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            print(f"❌ YAML Syntax Error: {e}")
-            return None
+    try:
+        return RootConfig.from_trusted(data)
+    except (KeyError, TypeError):
+        # Written by a version with a different configuration layout
+        return None
 
-    return validate_data(raw_data)
+
+def _write_config_cache(file_path: str, cache_path: str, cfg: RootConfig) -> None:
+    try:
+        os.makedirs(CONFIG_CACHE_DIR, mode=0o700, exist_ok=True)
+        _remove_config_caches(file_path)
+
+        with tempfile.NamedTemporaryFile(dir=CONFIG_CACHE_DIR, delete=False) as f:
+            try:
+                pickle.dump(cfg.model_dump(), f, protocol=5)
+                f.close()
+                os.replace(f.name, cache_path)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+    except OSError:
+        # The cache is only an optimization, e.g. the directory may be read-only
+        pass
+
+
+def _remove_config_caches(file_path: str) -> None:
+    # Only the cache of the latest content is kept for each configuration file
+    prefix = _get_config_cache_prefix(file_path)
+    for entry in os.scandir(CONFIG_CACHE_DIR):
+        if entry.name.startswith(prefix) and entry.name.endswith(".pkl"):
+            os.unlink(entry.path)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Example usage
     # Generating a test file that exercises the inheritance and errors
     test_yaml = """
@@ -188,5 +382,5 @@ clusters:
     cni: "cilium"
 """
 
-    raw_data = yaml.safe_load(test_yaml)
+    raw_data = yaml.load(test_yaml, Loader=SafeLoader)
     validate_data(raw_data)
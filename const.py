@@ -1 +1,23 @@
+import os
+from pathlib import Path
+
 DOCKER_NETWORK_NAME = "kind"  # kind does not allow custom networks, so we use the default one for k3d clusters also
+# Generated files live in the repository root, whatever the working directory is
+OUT_DIR = Path(__file__).resolve().parent / "out"
+
+
+def _read_parallelism() -> int:
+    value = os.environ.get("TESTBENCH_PARALLELISM", "8")
+    try:
+        parallelism = int(value)
+    except ValueError:
+        raise ValueError(
+            f"TESTBENCH_PARALLELISM must be an integer, got: {value!r}"
+        ) from None
+
+    # Thread pools need at least one worker
+    return max(parallelism, 1)
+
+
+# Max concurrent cluster operations
+PARALLELISM = _read_parallelism()
@@ -1,30 +1,36 @@
 import logging
-from enum import Enum
+from typing import Final
 
 
-class LogColors(str, Enum):
-    HEADER = "\033[95m"
-    OKBLUE = "\033[94m"
-    OKCYAN = "\033[96m"
-    OKGREEN = "\033[92m"
-    WARNING = "\033[93m"
-    FAIL = "\033[91m"
-    ENDC = "\033[0m"
-    BOLD = "\033[1m"
-    UNDERLINE = "\033[4m"
+HEADER: Final[str] = "\033[95m"
+OKBLUE: Final[str] = "\033[94m"
+OKCYAN: Final[str] = "\033[96m"
+OKGREEN: Final[str] = "\033[92m"
+WARNING: Final[str] = "\033[93m"
+FAIL: Final[str] = "\033[91m"
+ENDC: Final[str] = "\033[0m"
+BOLD: Final[str] = "\033[1m"
+UNDERLINE: Final[str] = "\033[4m"
+
+
+# Prefixes are built once, and messages are only formatted if the level is enabled
+_INFO_PREFIX = f"ℹ️ {OKBLUE}INFO{ENDC}\t"
+_SUCCESS_PREFIX = f"✅ {OKGREEN}SUCCESS{ENDC}\t"
+_WARNING_PREFIX = f"⚠️ {WARNING}WARNING{ENDC}\t"
+_ERROR_PREFIX = f"❌ {FAIL}ERROR{ENDC}\t"
 
 
 def log_info(message: str):
-    logging.info(f"ℹ️ {LogColors.OKBLUE}INFO{LogColors.ENDC}\t{message}")
+    logging.info("%s%s", _INFO_PREFIX, message)
 
 
 def log_success(message: str):
-    logging.info(f"✅ {LogColors.OKGREEN}SUCCESS{LogColors.ENDC}\t{message}")
+    logging.info("%s%s", _SUCCESS_PREFIX, message)
 
 
 def log_warning(message: str):
-    logging.warning(f"⚠️ {LogColors.WARNING}WARNING{LogColors.ENDC}\t{message}")
+    logging.warning("%s%s", _WARNING_PREFIX, message)
 
 
 def log_error(message: str):
-    logging.error(f"❌ {LogColors.FAIL}ERROR{LogColors.ENDC}\t{message}")
+    logging.error("%s%s", _ERROR_PREFIX, message)
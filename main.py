@@ -1,49 +1,94 @@
+import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 
-from config import validate_config_file, ClusterConfig, RuntimeEnum
-from clusters.base import Cluster
+from config import (
+    validate_config_file,
+    ClusterConfig,
+    DeploymentsConfig,
+    NamespaceConfig,
+    RuntimeEnum,
+)
+from clusters.base import Cluster, cleanup_many, create_many
 from clusters.k3d import K3d
 from clusters.kind import Kind
+from tools.base import Tool
 from tools.liqo import LiqoTool
 from const import DOCKER_NETWORK_NAME
-from utils.kubernetes_utils import create_kubernetes_namespace, create_deployment
+from utils.kubernetes_utils import apply_kubernetes_namespace, apply_deployment
 from utils.docker_utils import ensure_docker_network
 from utils.cache import run_registry_proxy_container
+from utils.parallel import run_parallel
+from logs import log_info, log_success
+
+
+# Cluster implementation for each supported runtime
+_RUNTIME_REGISTRY: Dict[RuntimeEnum, type[Cluster]] = {
+    RuntimeEnum.k3d: K3d,
+    RuntimeEnum.kind: Kind,
+}
 
 
 def parse_clusters(cluster_configs: List[ClusterConfig]) -> Dict[str, Cluster]:
     cls: Dict[str, Cluster] = {}
 
     for cfg in cluster_configs:
-        cluster: Cluster
-
-        match cfg.runtime:
-            case RuntimeEnum.k3d:
-                cluster = K3d(
-                    name=cfg.name,
-                    nodes=cfg.nodes,
-                    cluster_cidr=cfg.cluster_cidr,
-                    service_cidr=cfg.service_cidr,
-                    cni=cfg.cni,
-                )
-            case RuntimeEnum.kind:
-                cluster = Kind(
-                    name=cfg.name,
-                    nodes=cfg.nodes,
-                    cluster_cidr=cfg.cluster_cidr,
-                    service_cidr=cfg.service_cidr,
-                    cni=cfg.cni,
-                )
-            case _:
-                raise ValueError(f"Unsupported Runtime: {cfg.runtime}")
-
-        cls[cfg.name] = cluster
+        cluster_type = _RUNTIME_REGISTRY.get(cfg.runtime)
+        if cluster_type is None:
+            raise ValueError(f"Unsupported Runtime: {cfg.runtime}")
+
+        cls[cfg.name] = cluster_type(
+            name=cfg.name,
+            nodes=cfg.nodes,
+            cluster_cidr=cfg.cluster_cidr,
+            service_cidr=cfg.service_cidr,
+            cni=cfg.cni,
+        )
 
     return cls
 
 
+def setup_namespace(
+    cluster: Cluster, namespace: NamespaceConfig, kubeconfig: str
+) -> None:
+    log_info(f"Applying namespace: {namespace.name} in cluster: {cluster.name}")
+    apply_kubernetes_namespace(
+        kubeconfig=kubeconfig,
+        namespace_name=namespace.name,
+    )
+
+
+def setup_deployment(
+    cluster: Cluster,
+    namespace: NamespaceConfig,
+    deployment: DeploymentsConfig,
+    kubeconfig: str,
+) -> None:
+    log_info(
+        f"Applying deployment: {deployment.name} in namespace: {namespace.name} of cluster: {cluster.name}"
+    )
+    apply_deployment(
+        kubeconfig_path=kubeconfig,
+        deployment_name=deployment.name,
+        namespace=namespace.name,
+        pod_spec=deployment.pod_spec,
+        replicas=deployment.replicas,
+    )
+
+
+def install_tool(tool: Tool) -> None:
+    log_info(f"Installing tool: {tool.__class__.__name__}")
+    tool.install()
+    log_success(f"Tool {tool.__class__.__name__} installed successfully.")
+
+
 def main(config_file: str) -> None:
+    # The thread name tells apart the messages of tasks running in parallel
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(threadName)s %(message)s"
+    )
+
     # Fetch configuration
     cfg = validate_config_file(config_file)
     if cfg is None:
@@ -51,51 +96,55 @@ def main(config_file: str) -> None:
 
     clusters = parse_clusters(cfg.clusters)
 
-    # Cleanup
-    for cluster in clusters.values():
-        print(f"Cleaning up cluster: {cluster.name}")
-        cluster.cleanup()
-        print(f"Cluster {cluster.name} cleaned up successfully.")
-
     # Create Docker network
     ensure_docker_network(DOCKER_NETWORK_NAME)
 
-    # Setup cache if enabled
-    proxy_ip = None
-    if cfg.cache.enabled:
-        print("Setting up registry proxy cache...")
-        proxy_ip = run_registry_proxy_container()
-        print("Registry proxy cache set up successfully.")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Start the registry proxy cache in the background: its startup overlaps
+        # with the cleanup of the previous clusters
+        proxy_future = None
+        if cfg.cache.enabled:
+            log_info("Setting up registry proxy cache...")
+            proxy_future = executor.submit(run_registry_proxy_container)
 
-        for cluster in clusters.values():
-            cluster.set_proxy(proxy_ip)
+        # Cleanup
+        cleanup_many(clusters.values())
 
-    # Create clusters
-    for cluster in clusters.values():
-        print(f"Creating cluster: {cluster.name}")
-        cluster.create()
-        print(f"Cluster {cluster.name} created successfully.")
-
-    # Create deployments
-    for cluster in cfg.clusters:
-        for namespace in cluster.namespaces:
-            print(f"Creating namespace: {namespace.name} in cluster: {cluster.name}")
-            create_kubernetes_namespace(
-                kubeconfig=clusters[cluster.name].get_kubeconfig_location(),
-                namespace_name=namespace.name,
-            )
+        if proxy_future is not None:
+            proxy_ip = proxy_future.result()
+            log_success("Registry proxy cache set up successfully.")
 
-            for deployment in namespace.deployments:
-                print(
-                    f"Creating deployment: {deployment.name} in namespace: {namespace.name} of cluster: {cluster.name}"
-                )
-                create_deployment(
-                    kubeconfig_path=clusters[cluster.name].get_kubeconfig_location(),
-                    deployment_name=deployment.name,
-                    namespace=namespace.name,
-                    pod_spec=deployment.pod_spec,
-                    replicas=deployment.replicas,
-                )
+            for cluster in clusters.values():
+                cluster.set_proxy(proxy_ip)
+
+    # Create clusters
+    create_many(clusters.values())
+
+    # Apply namespaces, then the deployments inside them
+    kubeconfigs = {
+        name: cluster.get_kubeconfig_location() for name, cluster in clusters.items()
+    }
+    namespaces = [
+        (clusters[cluster.name], namespace)
+        for cluster in cfg.clusters
+        for namespace in cluster.namespaces
+    ]
+    run_parallel(
+        lambda task: setup_namespace(*task, kubeconfig=kubeconfigs[task[0].name]),
+        namespaces,
+        describe=lambda task: f"namespace {task[1].name} of cluster {task[0].name}",
+    )
+
+    deployments = [
+        (cluster, namespace, deployment)
+        for cluster, namespace in namespaces
+        for deployment in namespace.deployments
+    ]
+    run_parallel(
+        lambda task: setup_deployment(*task, kubeconfig=kubeconfigs[task[0].name]),
+        deployments,
+        describe=lambda task: f"deployment {task[2].name} of cluster {task[0].name}",
+    )
 
     # Install tools
     tools = []
@@ -107,10 +156,11 @@ def main(config_file: str) -> None:
             )
         )
 
-    for tool in tools:
-        print(f"Installing tool: {tool.__class__.__name__}")
-        tool.install()
-        print(f"Tool {tool.__class__.__name__} installed successfully.")
+    run_parallel(
+        install_tool,
+        tools,
+        describe=lambda tool: f"tool {tool.__class__.__name__}",
+    )
 
 
 if __name__ == "__main__":
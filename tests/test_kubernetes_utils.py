@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils import kubernetes_utils
+
+
+_KUBECONFIG = """
+apiVersion: v1
+kind: Config
+clusters:
+  - name: test
+    cluster:
+      server: https://127.0.0.1:6443
+contexts:
+  - name: test
+    context:
+      cluster: test
+      user: test
+current-context: test
+users:
+  - name: test
+    user:
+      token: test
+"""
+
+# Minimal discovery documents for the resources applied by the testbench
+_DISCOVERY = {
+    "/version": {"major": "1", "minor": "34", "gitVersion": "v1.34.0"},
+    "/api": {"kind": "APIVersions", "versions": ["v1"]},
+    "/apis": {
+        "kind": "APIGroupList",
+        "groups": [
+            {
+                "name": "apps",
+                "versions": [{"groupVersion": "apps/v1", "version": "v1"}],
+                "preferredVersion": {"groupVersion": "apps/v1", "version": "v1"},
+            }
+        ],
+    },
+    "/api/v1": {
+        "kind": "APIResourceList",
+        "groupVersion": "v1",
+        "resources": [
+            {
+                "name": "namespaces",
+                "singularName": "namespace",
+                "namespaced": False,
+                "kind": "Namespace",
+                "verbs": ["get", "patch"],
+            }
+        ],
+    },
+    "/apis/apps/v1": {
+        "kind": "APIResourceList",
+        "groupVersion": "apps/v1",
+        "resources": [
+            {
+                "name": "deployments",
+                "singularName": "deployment",
+                "namespaced": True,
+                "kind": "Deployment",
+                "verbs": ["get", "patch"],
+            }
+        ],
+    },
+}
+
+
+class _Response:
+    def __init__(self, body: dict) -> None:
+        self.status = 200
+        self.reason = "OK"
+        self.data = json.dumps(body).encode()
+
+    def getheaders(self) -> dict:
+        return {"Content-Type": "application/json"}
+
+    def getheader(self, name: str, default=None):
+        return self.getheaders().get(name, default)
+
+
+class ServerSideApplyTest(unittest.TestCase):
+    """Runs the apply helpers against the installed client with a fake transport."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        self.kubeconfig = os.path.join(self.tmp.name, "kubeconfig.yaml")
+        with open(self.kubeconfig, "w") as f:
+            f.write(_KUBECONFIG)
+
+        # Start from empty caches, and keep the discovery cache out of /tmp
+        for cached in (
+            kubernetes_utils.get_api_client,
+            kubernetes_utils._get_dynamic_client,
+            kubernetes_utils._get_resource,
+        ):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
+
+        patcher = mock.patch("tempfile.gettempdir", return_value=self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.patches = []
+        request = mock.patch(
+            "kubernetes.client.ApiClient.request",
+            autospec=True,
+            side_effect=self._request,
+        )
+        request.start()
+        self.addCleanup(request.stop)
+
+    def _request(self, api_client, method, url, query_params=None, headers=None,
+                 body=None, **kwargs):
+        path = url.split("6443", 1)[1]
+        if method == "GET":
+            return _Response(_DISCOVERY[path])
+
+        self.patches.append((method, path, dict(query_params), headers, body))
+        return _Response(body)
+
+    def test_apply_namespace(self) -> None:
+        kubernetes_utils.apply_kubernetes_namespace(self.kubeconfig, "demo")
+
+        ((method, path, query, headers, body),) = self.patches
+        self.assertEqual(method, "PATCH")
+        self.assertEqual(path, "/api/v1/namespaces/demo")
+        self.assertEqual(query["fieldManager"], "testbench")
+        self.assertTrue(query["force"])
+        self.assertEqual(headers["Content-Type"], "application/apply-patch+yaml")
+        self.assertEqual(body["metadata"]["name"], "demo")
+
+    def test_apply_deployment(self) -> None:
+        kubernetes_utils.apply_deployment(
+            kubeconfig_path=self.kubeconfig,
+            deployment_name="web",
+            namespace="demo",
+            replicas=2,
+            pod_spec={"containers": [{"name": "web", "image": "nginx"}]},
+        )
+
+        ((method, path, query, headers, body),) = self.patches
+        self.assertEqual(method, "PATCH")
+        self.assertEqual(path, "/apis/apps/v1/namespaces/demo/deployments/web")
+        self.assertEqual(query["fieldManager"], "testbench")
+        self.assertEqual(headers["Content-Type"], "application/apply-patch+yaml")
+        self.assertEqual(body["spec"]["replicas"], 2)
+        self.assertEqual(body["spec"]["selector"], {"matchLabels": {"app": "web"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,24 @@
-import subprocess
-from typing import Dict
+from typing import Dict, List, Tuple
 
 from clusters.kind import Kind
-from config import LiqoConfig
+from config import LiqoConfig, LiqoInstallationConfig
 from tools.base import Tool
 from clusters.k3d import K3d
 from clusters.base import Cluster
+from logs import log_info
+from utils.parallel import run_parallel
+from utils.kubernetes_utils import get_deployment_images
+from utils.process_utils import run_tagged
+
+
+def _build_arguments(parameters: Tuple[Tuple[str, str | None], ...]) -> List[str]:
+    # The parameters keep their order, so the generated commands are deterministic
+    return [
+        arg
+        for param, value in parameters
+        if value is not None
+        for arg in (param, value)
+    ]
 
 
 class LiqoTool(Tool):
@@ -17,42 +30,81 @@ class LiqoTool(Tool):
         self.clusters = clusters
 
     def install(self) -> None:
-        for installation in self.config.installations:
-            cluster = self.clusters[installation.cluster]
-
-            if isinstance(cluster, K3d):
-                self._install_in_cluster(
-                    runtime="k3s",
-                    cluster_id=cluster.name,
-                    kubeconfig=cluster.get_kubeconfig_location(),
-                    version=installation.version,
-                    api_server_url=f"https://{cluster.get_api_server_address()}:6443",
-                    pod_cidr=cluster.cluster_cidr,
-                    service_cidr=cluster.service_cidr,
-                )
-            elif isinstance(cluster, Kind):
-                self._install_in_cluster(
-                    runtime="kind",
-                    cluster_id=cluster.name,
-                    kubeconfig=cluster.get_kubeconfig_location(),
-                    version=installation.version,
-                )
-            else:
-                raise ValueError(
-                    f"Liqo installation is not supported for cluster: {cluster.name}"
-                )
-
-        for peering in self.config.peerings:
-            cluster_a = self.clusters[peering[0]]
-            cluster_b = self.clusters[peering[1]]
-
-            self._peer_clusters(
-                kubeconfig=cluster_a.get_kubeconfig_location(),
-                remote_kubeconfig=cluster_b.get_kubeconfig_location(),
-                gw_server_service_type="LoadBalancer"
-                if isinstance(cluster_b, K3d)
-                else "NodePort",
+        # Installations target different clusters, so they can run at the same time
+        run_parallel(
+            self._install,
+            self.config.installations,
+            describe=lambda installation: f"Liqo in cluster {installation.cluster}",
+        )
+
+        # Peerings sharing a cluster are run in different rounds
+        for peerings in self._schedule_peerings(self.config.peerings):
+            run_parallel(
+                self._peer,
+                peerings,
+                describe=lambda peering: f"peering {peering[0]} -> {peering[1]}",
+            )
+
+    def _install(self, installation: LiqoInstallationConfig) -> None:
+        cluster = self.clusters[installation.cluster]
+
+        if isinstance(cluster, K3d):
+            self._install_in_cluster(
+                runtime="k3s",
+                cluster_id=cluster.name,
+                kubeconfig=cluster.get_kubeconfig_location(),
+                version=installation.version,
+                api_server_url=f"https://{cluster.get_api_server_address()}:6443",
+                pod_cidr=cluster.cluster_cidr,
+                service_cidr=cluster.service_cidr,
             )
+        elif isinstance(cluster, Kind):
+            self._install_in_cluster(
+                runtime="kind",
+                cluster_id=cluster.name,
+                kubeconfig=cluster.get_kubeconfig_location(),
+                version=installation.version,
+            )
+        else:
+            raise ValueError(
+                f"Liqo installation is not supported for cluster: {cluster.name}"
+            )
+
+    def _peer(self, peering: Tuple[str, str]) -> None:
+        cluster_a = self.clusters[peering[0]]
+        cluster_b = self.clusters[peering[1]]
+
+        self._peer_clusters(
+            kubeconfig=cluster_a.get_kubeconfig_location(),
+            remote_kubeconfig=cluster_b.get_kubeconfig_location(),
+            gw_server_service_type="LoadBalancer"
+            if isinstance(cluster_b, K3d)
+            else "NodePort",
+            tag=f"{cluster_a.name} -> {cluster_b.name}",
+        )
+
+    @staticmethod
+    def _schedule_peerings(
+        peerings: List[Tuple[str, str]],
+    ) -> List[List[Tuple[str, str]]]:
+        """
+        Groups the peerings in rounds where every cluster appears at most once.
+        Each peering is placed after the last round involving one of its clusters,
+        so peerings sharing a cluster keep their configured order.
+        """
+        rounds: List[List[Tuple[str, str]]] = []
+        last_round: Dict[str, int] = {}
+
+        for peering in peerings:
+            index = max(last_round.get(name, -1) for name in peering) + 1
+            if index == len(rounds):
+                rounds.append([])
+
+            rounds[index].append(peering)
+            for name in peering:
+                last_round[name] = index
+
+        return rounds
 
     def _install_in_cluster(
         self,
@@ -64,62 +116,67 @@ class LiqoTool(Tool):
         pod_cidr: str | None = None,
         service_cidr: str | None = None,
     ) -> None:
-        print(f"Installing Liqo version {version}")
-
         repo_url = None
         version_hash = None
         if version is not None and version != "latest":
             (repo_url, version_hash) = version.split("@")
 
-        command = [
-            "liqoctl",
-            "install",
-            runtime,
-        ]
-
-        # Build installation command by adding parameters
-        parameters = {
-            "--cluster-id": cluster_id,
-            "--pod-cidr": pod_cidr,
-            "--service-cidr": service_cidr,
-            "--kubeconfig": kubeconfig,
-            "--api-server-url": api_server_url,
-            "--repo-url": repo_url,
-            "--version": version_hash,
-        }
-
-        for param, value in parameters.items():
-            if value is not None:
-                command.extend([param, value])
-
-        print(f"Running command: {' '.join(command)}")
+        # Reinstalling the same version would only reconcile an unchanged release
+        if version_hash is not None and self._is_installed(kubeconfig, version_hash):
+            log_info(
+                f"Liqo version {version} already installed in cluster: {cluster_id}"
+            )
+            return
+
+        log_info(f"Installing Liqo version {version} in cluster: {cluster_id}")
+
+        # Build installation command by adding the parameters that are set
+        parameters = (
+            ("--cluster-id", cluster_id),
+            ("--pod-cidr", pod_cidr),
+            ("--service-cidr", service_cidr),
+            ("--kubeconfig", kubeconfig),
+            ("--api-server-url", api_server_url),
+            ("--repo-url", repo_url),
+            ("--version", version_hash),
+        )
+        command = ["liqoctl", "install", runtime, *_build_arguments(parameters)]
+
+        log_info(f"Running command: {' '.join(command)}")
 
         # Execute installation command
-        subprocess.run(command, check=True)
+        run_tagged(command, tag=cluster_id)
+
+    @staticmethod
+    def _is_installed(kubeconfig: str, version_hash: str) -> bool:
+        images = get_deployment_images(
+            kubeconfig=kubeconfig,
+            deployment_name="liqo-controller-manager",
+            namespace="liqo",
+        )
+        if not images:
+            return False
+
+        # The image tag is whatever follows the last ':' after the registry address
+        name = images[0].rsplit("/", 1)[-1]
+        return ":" in name and name.rsplit(":", 1)[1] == version_hash
 
     def _peer_clusters(
         self,
         kubeconfig: str,
         remote_kubeconfig: str,
         gw_server_service_type: str,
+        tag: str,
     ) -> None:
-        print("Peering clusters")
-
-        command = [
-            "liqoctl",
-            "peer",
-        ]
-
-        # Build installation command by adding parameters
-        parameters = {
-            "--kubeconfig": kubeconfig,
-            "--remote-kubeconfig": remote_kubeconfig,
-            "--gw-server-service-type": gw_server_service_type,
-        }
+        log_info(f"Peering clusters: {tag}")
 
-        for param, value in parameters.items():
-            if value is not None:
-                command.extend([param, value])
+        # Build peering command by adding the parameters that are set
+        parameters = (
+            ("--kubeconfig", kubeconfig),
+            ("--remote-kubeconfig", remote_kubeconfig),
+            ("--gw-server-service-type", gw_server_service_type),
+        )
+        command = ["liqoctl", "peer", *_build_arguments(parameters)]
 
         # Execute peering command
-        subprocess.run(command, check=True)
+        run_tagged(command, tag=tag)
@@ -1,13 +1,11 @@
-import os
-
 from utils.docker_utils import ensure_docker_container
-from const import DOCKER_NETWORK_NAME
+from const import DOCKER_NETWORK_NAME, OUT_DIR
 
 
 REGISTRY_PROXY_IMAGE = "rpardini/docker-registry-proxy:0.6.5"  # TODO: variable
 REGISTRY_PROXY_CONTAINER_NAME = "testbench-registry-proxy"
-REGISTRY_PROXY_CA_VOLUME = os.path.abspath("./out/registry-proxy/ca")
-REGISTRY_PROXY_CACHE_VOLUME = os.path.abspath("./out/registry-proxy/cache")
+REGISTRY_PROXY_CA_VOLUME = str(OUT_DIR / "registry-proxy" / "ca")
+REGISTRY_PROXY_CACHE_VOLUME = str(OUT_DIR / "registry-proxy" / "cache")
 
 
 def run_registry_proxy_container() -> str:
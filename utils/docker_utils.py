@@ -1,7 +1,13 @@
+import functools
+
 import docker
 
+from const import PARALLELISM
+
 
-client = docker.from_env()
+# Shared by all threads: the pool must fit one connection per concurrent task,
+# never going below the docker default of 10
+client = docker.from_env(max_pool_size=max(PARALLELISM, 10))
 
 
 def ensure_docker_container(
@@ -34,10 +40,12 @@ def get_container(container_name: str) -> docker.models.containers.Container:
         return None
 
 
+@functools.cache
 def ensure_docker_network(
     network_name: str,
     driver: str = "bridge",
 ) -> docker.models.networks.Network:
+    # Cached: the network is only checked and created once per process
     network = get_network(network_name)
     if network is not None:
         return network
@@ -55,3 +63,18 @@ def get_network(network_name: str) -> docker.models.networks.Network | None:
         return client.networks.get(network_name)
     except docker.errors.NotFound:
         return None
+
+
+def ensure_docker_image(image: str) -> docker.models.images.Image:
+    image_obj = get_image(image)
+    if image_obj is not None:
+        return image_obj
+
+    return client.images.pull(image)
+
+
+def get_image(image: str) -> docker.models.images.Image | None:
+    try:
+        return client.images.get(image)
+    except docker.errors.ImageNotFound:
+        return None
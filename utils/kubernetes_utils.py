@@ -1,54 +1,151 @@
-from kubernetes import client, config
-from kubernetes.client.rest import ApiException
+import functools
+import threading
+import time
+from typing import TYPE_CHECKING
 
+# The kubernetes client takes a while to import, so it is only loaded when used
+if TYPE_CHECKING:
+    from kubernetes import client, dynamic
 
-def create_kubernetes_namespace(kubeconfig: str, namespace_name: str) -> bool:
-    k8s_client = config.new_client_from_config(config_file=kubeconfig)
-    core_v1 = client.CoreV1Api(api_client=k8s_client)
 
-    namespace_manifest = client.V1Namespace(
-        metadata=client.V1ObjectMeta(name=namespace_name)
+def new_api_client(kubeconfig: str, pool_maxsize: int = 16) -> "client.ApiClient":
+    from kubernetes import client
+    from kubernetes import config as kube_config
+
+    # The pool size must be set before the client is built, as it sizes the urllib3 pool
+    configuration = client.Configuration()
+    kube_config.load_kube_config(
+        config_file=kubeconfig, client_configuration=configuration
     )
+    configuration.connection_pool_maxsize = pool_maxsize
 
-    try:
-        core_v1.create_namespace(body=namespace_manifest)
-        return True
+    return client.ApiClient(configuration=configuration)
 
-    except ApiException as e:
-        if e.status == 409:
-            return False  # Namespace already exists
-        else:
-            raise  # Rethrow other exceptions
 
+@functools.lru_cache(maxsize=None)
+def get_api_client(kubeconfig: str) -> "client.ApiClient":
+    # Parsing the kubeconfig and setting up TLS is costly: one client per cluster
+    return new_api_client(kubeconfig)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_apps_v1_api(kubeconfig: str) -> "client.AppsV1Api":
+    from kubernetes import client
+
+    return client.AppsV1Api(api_client=get_api_client(kubeconfig))
+
+
+# Server-side apply makes every request idempotent, so re-runs update in place
+_FIELD_MANAGER = "testbench"
+
+# API discovery fills a cache shared by the threads of the same cluster
+_DISCOVERY_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_dynamic_client(kubeconfig: str) -> "dynamic.DynamicClient":
+    from kubernetes import dynamic
+
+    return dynamic.DynamicClient(get_api_client(kubeconfig))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_resource(
+    kubeconfig: str, api_version: str, kind: str
+) -> "dynamic.Resource":
+    with _DISCOVERY_LOCK:
+        return _get_dynamic_client(kubeconfig).resources.get(
+            api_version=api_version, kind=kind
+        )
+
+
+def _server_side_apply(kubeconfig: str, manifest: dict) -> None:
+    resource = _get_resource(kubeconfig, manifest["apiVersion"], manifest["kind"])
+    _get_dynamic_client(kubeconfig).server_side_apply(
+        resource,
+        body=manifest,
+        field_manager=_FIELD_MANAGER,
+        force_conflicts=True,
+    )
+
+
+def apply_kubernetes_namespace(kubeconfig: str, namespace_name: str) -> None:
+    namespace_manifest = {
+        "apiVersion": "v1",
+        "kind": "Namespace",
+        "metadata": {"name": namespace_name},
+    }
+
+    _server_side_apply(kubeconfig, namespace_manifest)
 
-def create_deployment(
+
+def apply_deployment(
     kubeconfig_path: str,
     deployment_name: str,
     namespace: str,
     replicas: int,
     pod_spec: dict,
-):
-    k8s_client = config.new_client_from_config(config_file=kubeconfig_path)
-    apps_v1 = client.AppsV1Api(api_client=k8s_client)
-
+) -> None:
     labels = {"app": deployment_name}
 
-    template = client.V1PodTemplateSpec(
-        metadata=client.V1ObjectMeta(labels=labels),
-        spec=pod_spec,
-    )
+    deployment = {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": deployment_name, "namespace": namespace},
+        "spec": {
+            "replicas": replicas,
+            "selector": {"matchLabels": labels},
+            "template": {
+                "metadata": {"labels": labels},
+                "spec": pod_spec,
+            },
+        },
+    }
 
-    spec = client.V1DeploymentSpec(
-        replicas=replicas,
-        template=template,
-        selector=client.V1LabelSelector(match_labels=labels),
-    )
+    _server_side_apply(kubeconfig_path, deployment)
 
-    deployment = client.V1Deployment(
-        api_version="apps/v1",
-        kind="Deployment",
-        metadata=client.V1ObjectMeta(name=deployment_name),
-        spec=spec,
-    )
 
-    apps_v1.create_namespaced_deployment(namespace=namespace, body=deployment)
+def get_deployment_images(
+    kubeconfig: str, deployment_name: str, namespace: str
+) -> list[str] | None:
+    """Returns the container images of a deployment, or None if it does not exist."""
+    from kubernetes.client.rest import ApiException
+
+    apps_v1 = _get_apps_v1_api(kubeconfig)
+
+    try:
+        deployment = apps_v1.read_namespaced_deployment(
+            name=deployment_name, namespace=namespace
+        )
+    except ApiException as e:
+        if e.status == 404:
+            return None
+        raise
+
+    return [container.image for container in deployment.spec.template.spec.containers]
+
+
+def wait_for_nodes_ready(
+    api_client: "client.ApiClient", timeout: float = 300, interval: float = 2
+) -> None:
+    from kubernetes import client
+
+    core_v1 = client.CoreV1Api(api_client=api_client)
+    deadline = time.monotonic() + timeout
+
+    while True:
+        nodes = core_v1.list_node(watch=False).items
+        if nodes and all(_is_node_ready(node) for node in nodes):
+            return
+
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Nodes not ready after {timeout} seconds")
+
+        time.sleep(interval)
+
+
+def _is_node_ready(node: "client.V1Node") -> bool:
+    return any(
+        condition.type == "Ready" and condition.status == "True"
+        for condition in node.status.conditions or []
+    )
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, TypeVar
+
+from const import PARALLELISM
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def run_parallel(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = PARALLELISM,
+    describe: Callable[[T], str] = str,
+) -> list[R]:
+    """
+    Runs func on every item in a thread pool and returns the results in input order.
+    Every task is awaited; failures are raised together as an ExceptionGroup,
+    each annotated with the description of the item that caused it.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    results: list[R] = [None] * len(items)
+    errors: list[Exception] = []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = {executor.submit(func, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                e.add_note(f"While processing: {describe(items[index])}")
+                errors.append(e)
+
+    if errors:
+        raise ExceptionGroup(f"{len(errors)} of {len(items)} tasks failed", errors)
+
+    return results
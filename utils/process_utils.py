@@ -0,0 +1,28 @@
+import logging
+import shutil
+import subprocess
+
+
+def run_tagged(command: list[str], tag: str) -> None:
+    """
+    Runs a command forwarding its output line by line to logging, prefixed by the tag,
+    so that the output of commands running in parallel stays readable.
+    """
+    # Descriptors are not inheritable by default, so they do not need to be closed.
+    # Together with a resolved executable path, this lets CPython spawn the process
+    # with posix_spawn instead of fork and exec
+    executable = shutil.which(command[0]) or command[0]
+
+    with subprocess.Popen(
+        [executable, *command[1:]],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        close_fds=False,
+    ) as process:
+        for line in process.stdout:
+            logging.info("[%s] %s", tag, line.rstrip())
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
@@ -0,0 +1,7 @@
+# Prefer the LibYAML-backed implementations, falling back to pure Python if unavailable
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+__all__ = ["SafeDumper", "SafeLoader"]